@@ -10,6 +10,24 @@ class SAF_LCA_Model:
     Life Cycle Assessment (LCA) Model for Sustainable Aviation Fuel (SAF)
     """
     
+    # Define carbon intensities for different electricity sources (kg CO2e/kWh)
+    electricity_carbon_intensities = {
+        "grid_global": 0.475,       # Global average grid electricity
+        "grid_eu": 0.253,           # European Union average
+        "grid_china": 0.638,        # China average
+        "grid_us": 0.389,           # US average
+        "natural_gas": 0.410,       # Natural gas combined cycle
+        "coal": 0.820,              # Coal power plants
+        "solar": 0.048,             # Solar PV
+        "wind": 0.011,              # Wind power
+        "hydro": 0.024,             # Hydroelectric
+        "nuclear": 0.012,           # Nuclear power
+        "biomass": 0.230,           # Biomass power
+        "renewable_mix": 0.030,     # Mix of solar, wind, and hydro
+        "low_carbon_mix": 0.100,    # Mix of renewables and nuclear
+        "renewable": 0.020          # Generic renewable (default)
+    }
+    
     def __init__(self, pathway="FT", functional_unit="MJ", co2_source=None):
         """
         Initialize the SAF LCA model
@@ -205,32 +223,9 @@ class SAF_LCA_Model:
         electricity_carbon_intensity : float, optional
             Carbon intensity of electricity (kg CO2e/kWh). If None, will be set based on electricity_source.
         """
-        # Define carbon intensities for different electricity sources (kg CO2e/kWh)
-        electricity_carbon_intensities = {
-            "grid_global": 0.475,       # Global average grid electricity
-            "grid_eu": 0.253,           # European Union average
-            "grid_china": 0.638,        # China average
-            "grid_us": 0.389,           # US average
-            "natural_gas": 0.410,       # Natural gas combined cycle
-            "coal": 0.820,              # Coal power plants
-            "solar": 0.048,             # Solar PV
-            "wind": 0.011,              # Wind power
-            "hydro": 0.024,             # Hydroelectric
-            "nuclear": 0.012,           # Nuclear power
-            "biomass": 0.230,           # Biomass power
-            "renewable_mix": 0.030,     # Mix of solar, wind, and hydro
-            "low_carbon_mix": 0.100,    # Mix of renewables and nuclear
-            "renewable": 0.020          # Generic renewable (default)
-        }
-        
         # If electricity_carbon_intensity is not provided, set it based on the source
         if electricity_carbon_intensity is None:
-            if electricity_source in electricity_carbon_intensities:
-                electricity_carbon_intensity = electricity_carbon_intensities[electricity_source]
-            else:
-                # Default to renewable if source not recognized
-                electricity_carbon_intensity = electricity_carbon_intensities["renewable"]
-                print(f"Warning: Electricity source '{electricity_source}' not recognized. Using default value.")
+            electricity_carbon_intensity = self.resolve_carbon_intensity(electricity_source)
         
         self.electrolysis_data = {
             "co2_electrolysis_efficiency": co2_electrolysis_efficiency,
@@ -242,6 +237,34 @@ class SAF_LCA_Model:
             "water_usage": water_usage
         }
     
+    @classmethod
+    def resolve_carbon_intensity(cls, electricity_source):
+        """
+        Look up the carbon intensity of one or more electricity sources
+        
+        Parameters:
+        -----------
+        electricity_source : str or sequence of str
+            Electricity source(s), keys of electricity_carbon_intensities.
+            Unrecognized sources fall back to "renewable" with a warning.
+            
+        Returns:
+        --------
+        float or ndarray: Carbon intensity (kg CO2e/kWh), an array for a sequence of sources
+        """
+        intensities = cls.electricity_carbon_intensities
+        sources = [electricity_source] if isinstance(electricity_source, str) else electricity_source
+        unique, inverse = np.unique(np.asarray(sources, dtype=str), return_inverse=True)
+        for source in unique:
+            if source not in intensities:
+                # Default to renewable if source not recognized
+                print(f"Warning: Electricity source '{source}' not recognized. Using default value.")
+        lookup = np.array([intensities.get(source, intensities["renewable"]) for source in unique])
+        
+        if isinstance(electricity_source, str):
+            return float(lookup[inverse[0]])
+        return lookup[inverse]
+    
     def analyze_electricity_sources(self, electricity_sources=None):
         """
         Analyze the impact of different electricity sources on SAF carbon intensity
@@ -0,0 +1,570 @@
+#%%
+import asyncio
+import collections
+import json
+import time
+
+import numpy as np
+
+from LCA_calculation import SAF_LCA_Model
+
+# Scenario sections and the SAF_LCA_Model setter each one is passed to
+SCENARIO_STAGES = {
+    "feedstock": "set_feedstock_data",
+    "conversion": "set_conversion_data",
+    "distribution": "set_distribution_data",
+    "use_phase": "set_use_phase_data",
+    "carbon_capture": "set_carbon_capture_data",
+    "electrolysis": "set_electrolysis_data"
+}
+
+# Top-level scenario keys passed to the SAF_LCA_Model constructor
+SCENARIO_MODEL_KEYS = ("pathway", "functional_unit", "co2_source")
+
+
+class ServiceUnavailableError(RuntimeError):
+    """Raised for requests the service cannot accept or finish because it is not running"""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _normalize_scenario(scenario):
+    """
+    Validate a scenario
+
+    Parameters:
+    -----------
+    scenario : dict
+        Scenario with optional "pathway", "functional_unit" and "co2_source"
+        keys and one section of setter keyword arguments per SCENARIO_STAGES
+        entry, e.g. {"electrolysis": {"co2_electrolysis_efficiency": 65.0, ...}}
+
+    Returns:
+    --------
+    dict: Normalized copy of the scenario
+    """
+    if not isinstance(scenario, dict):
+        raise ValueError("Scenario must be a JSON object")
+
+    unknown = set(scenario) - set(SCENARIO_STAGES) - set(SCENARIO_MODEL_KEYS)
+    if unknown:
+        raise ValueError(f"Unsupported scenario keys: {sorted(unknown)}")
+
+    normalized = {
+        "pathway": scenario.get("pathway", "FT"),
+        "functional_unit": scenario.get("functional_unit", "MJ"),
+        "co2_source": scenario.get("co2_source")
+    }
+
+    for stage in SCENARIO_STAGES:
+        if stage not in scenario:
+            continue
+        if not isinstance(scenario[stage], dict):
+            raise ValueError(f"Scenario section '{stage}' must be a JSON object")
+        normalized[stage] = dict(scenario[stage])
+
+    return normalized
+
+
+def _batch_key(scenario):
+    """Scenarios sharing model settings and parameter names can be stacked together"""
+    stages = tuple((stage, tuple(sorted(scenario[stage])))
+                   for stage in SCENARIO_STAGES if stage in scenario)
+    return tuple(str(scenario[key]) for key in SCENARIO_MODEL_KEYS) + stages
+
+
+def evaluate_stacked(scenario, size, fossil_jet_emissions=89.0):
+    """
+    Evaluate stacked scenarios in one vectorized calculate_lca pass
+
+    Parameters:
+    -----------
+    scenario : dict
+        Scenario in the format accepted by evaluate_scenarios whose numeric
+        parameters may be arrays of length size. "electricity_source" may be
+        a sequence; its intensities are used where
+        "electricity_carbon_intensity" is not given.
+    size : int
+        Number of stacked scenarios
+    fossil_jet_emissions : float
+        Life cycle GHG emissions of fossil jet fuel (g CO2e/MJ)
+
+    Returns:
+    --------
+    dict: Results in the structure returned by calculate_lca plus
+    "emission_reduction", every value an array of shape (size,)
+    """
+    model = SAF_LCA_Model(pathway=scenario.get("pathway", "FT"),
+                          functional_unit=scenario.get("functional_unit", "MJ"),
+                          co2_source=scenario.get("co2_source"))
+
+    for stage, setter in SCENARIO_STAGES.items():
+        if stage not in scenario:
+            continue
+        kwargs = dict(scenario[stage])
+        if (stage == "electrolysis" and kwargs.get("electricity_carbon_intensity") is None
+                and kwargs.get("electricity_source") is not None):
+            kwargs["electricity_carbon_intensity"] = SAF_LCA_Model.resolve_carbon_intensity(
+                kwargs["electricity_source"])
+        getattr(model, setter)(**kwargs)
+
+    results = model.calculate_lca()
+
+    # Convert results to g CO2e/MJ for comparison with fossil jet fuel
+    if model.functional_unit == "MJ":
+        saf_emissions = results["ghg_emissions"]["total"] * 1000  # kg to g
+    else:
+        energy_density = model.use_phase_data["energy_density"]  # MJ/kg
+        saf_emissions = results["ghg_emissions"]["total"] * 1000 / energy_density
+    emission_reduction = (fossil_jet_emissions - saf_emissions) / fossil_jet_emissions * 100
+
+    stacked = {
+        category: {stage: np.broadcast_to(np.asarray(value, dtype=float), (size,))
+                   for stage, value in stages.items()}
+        for category, stages in results.items()
+    }
+    stacked["emission_reduction"] = np.broadcast_to(np.asarray(emission_reduction, dtype=float), (size,))
+    return stacked
+
+
+def _evaluate_group(scenarios, fossil_jet_emissions):
+    """
+    Evaluate scenarios with identical structure in one vectorized calculate_lca pass
+    """
+    first = scenarios[0]
+    stacked_scenario = {key: first[key] for key in SCENARIO_MODEL_KEYS}
+
+    for stage in SCENARIO_STAGES:
+        if stage not in first:
+            continue
+        stacked_scenario[stage] = {}
+        for name in first[stage]:
+            values = [scenario[stage][name] for scenario in scenarios]
+            if all(_is_number(value) for value in values):
+                stacked_scenario[stage][name] = np.array(values, dtype=float)
+            elif all(value == values[0] for value in values):
+                stacked_scenario[stage][name] = values[0]
+            else:
+                stacked_scenario[stage][name] = values
+
+    size = len(scenarios)
+    # Zero denominators (e.g. an efficiency of 0) give inf/nan instead of raising
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stacked = evaluate_stacked(stacked_scenario, size, fossil_jet_emissions)
+
+    finite = np.isfinite(stacked["emission_reduction"])
+    for category, stages in stacked.items():
+        if category != "emission_reduction":
+            for value in stages.values():
+                finite &= np.isfinite(value)
+
+    per_scenario = [{} for _ in range(size)]
+    for category, stages in stacked.items():
+        if category == "emission_reduction":
+            for i in range(size):
+                per_scenario[i][category] = float(stages[i])
+            continue
+        for stage, value in stages.items():
+            for i in range(size):
+                per_scenario[i].setdefault(category, {})[stage] = float(value[i])
+
+    for i in np.flatnonzero(~finite):
+        per_scenario[i] = ValueError("LCA result is not finite; check efficiencies and other "
+                                     "denominators for zero values")
+
+    return per_scenario
+
+
+def evaluate_scenarios(scenarios, fossil_jet_emissions=89.0):
+    """
+    Evaluate a batch of LCA scenarios with as few calculate_lca calls as possible
+
+    Scenarios sharing the model settings and the same parameter names are
+    stacked into arrays and evaluated together. If a stacked group fails, its
+    scenarios are evaluated one by one so that errors stay with the scenario
+    that caused them.
+
+    Parameters:
+    -----------
+    scenarios : list of dict
+        Scenarios in the format accepted by the evaluation service
+    fossil_jet_emissions : float
+        Life cycle GHG emissions of fossil jet fuel (g CO2e/MJ)
+
+    Returns:
+    --------
+    list: One results dict (as returned by calculate_lca, plus
+    "emission_reduction") or Exception per scenario, in input order
+    """
+    outcomes = [None] * len(scenarios)
+    groups = collections.defaultdict(list)
+
+    for i, scenario in enumerate(scenarios):
+        try:
+            normalized = _normalize_scenario(scenario)
+        except Exception as error:
+            outcomes[i] = error
+            continue
+        groups[_batch_key(normalized)].append((i, normalized))
+
+    for members in groups.values():
+        try:
+            results = _evaluate_group([scenario for _, scenario in members], fossil_jet_emissions)
+        except Exception:
+            # Isolate the failing scenario(s)
+            results = []
+            for _, scenario in members:
+                try:
+                    results.append(_evaluate_group([scenario], fossil_jet_emissions)[0])
+                except Exception as error:
+                    results.append(error)
+        for (i, _), result in zip(members, results):
+            outcomes[i] = result
+
+    return outcomes
+
+
+class SAF_Evaluation_Service:
+    """
+    Local asyncio service that coalesces concurrent LCA requests into micro-batches
+    """
+
+    def __init__(self, max_batch_size=256, max_latency=0.005, stats_window=10000,
+                 fossil_jet_emissions=89.0):
+        """
+        Initialize the evaluation service
+
+        Parameters:
+        -----------
+        max_batch_size : int
+            Maximum number of scenarios evaluated in one pass
+        max_latency : float
+            Time (s) a batch waits for further requests after the first one arrives
+        stats_window : int
+            Number of most recent requests (and batches) kept for the latency
+            percentiles and mean batch size reported by stats()
+        fossil_jet_emissions : float
+            Life cycle GHG emissions of fossil jet fuel (g CO2e/MJ)
+        """
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if max_latency < 0:
+            raise ValueError("max_latency must not be negative")
+
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.fossil_jet_emissions = fossil_jet_emissions
+
+        self._queue = None
+        self._worker = None
+        self._server = None
+        self._current_batch = []
+        self._latencies = collections.deque(maxlen=stats_window)
+        self._batch_sizes = collections.deque(maxlen=stats_window)
+        self._requests = 0
+        self._batches = 0
+
+    async def start(self):
+        """Start the batching worker"""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        """Stop the HTTP server (if any) and the batching worker, failing unfinished requests"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+            # Requests still queued or in the cancelled batch would otherwise wait forever
+            pending = [future for _, future, _ in self._current_batch]
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait()[1])
+            self._current_batch = []
+            for future in pending:
+                if not future.done():
+                    future.set_exception(ServiceUnavailableError("Service stopped"))
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def evaluate(self, scenario):
+        """
+        Queue a scenario and wait for its results
+
+        Parameters:
+        -----------
+        scenario : dict
+            Scenario in the format accepted by evaluate_scenarios
+
+        Returns:
+        --------
+        dict: LCA results of the scenario
+        """
+        if self._worker is None:
+            raise ServiceUnavailableError("Service is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((scenario, future, time.perf_counter()))
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._current_batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_latency
+
+            # Collect further requests until the window closes or the batch is full
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            scenarios = [scenario for scenario, _, _ in batch]
+            try:
+                outcomes = await loop.run_in_executor(
+                    None, evaluate_scenarios, scenarios, self.fossil_jet_emissions)
+            except Exception as error:
+                outcomes = [error] * len(batch)
+
+            finished = time.perf_counter()
+            self._batches += 1
+            self._batch_sizes.append(len(batch))
+            for (_, future, submitted), outcome in zip(batch, outcomes):
+                self._requests += 1
+                self._latencies.append(finished - submitted)
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+            self._current_batch = []
+
+    def stats(self):
+        """
+        Service metrics
+
+        Returns:
+        --------
+        dict: Queue depth, request and batch counts, mean batch size and
+        latency percentiles (ms) over the most recent requests
+        """
+        latencies = np.array(self._latencies) * 1000  # s to ms
+        if latencies.size:
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        else:
+            p50 = p90 = p99 = None
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": float(np.mean(self._batch_sizes)) if self._batch_sizes else None,
+            "latency_ms_p50": None if p50 is None else float(p50),
+            "latency_ms_p90": None if p90 is None else float(p90),
+            "latency_ms_p99": None if p99 is None else float(p99)
+        }
+
+    async def serve(self, host="127.0.0.1", port=0):
+        """
+        Serve the evaluation service over HTTP
+
+        Endpoints:
+        ----------
+        POST /evaluate : scenario JSON in, results JSON out
+        GET /stats : service metrics
+
+        Parameters:
+        -----------
+        host : str
+            Interface to bind (local only by default)
+        port : int
+            Port to bind; 0 picks a free port
+
+        Returns:
+        --------
+        tuple: (host, port) the server is listening on
+        """
+        await self.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                length = int(headers.get("content-length", 0))
+            except ValueError:
+                length = -1
+
+            if len(request_line) < 2:
+                status, payload = 400, {"error": "Malformed request"}
+            elif length < 0:
+                status, payload = 400, {"error": "Invalid Content-Length"}
+            else:
+                method, path = request_line[0], request_line[1]
+                body = await reader.readexactly(length)
+                status, payload = await self._dispatch(method, path, body)
+
+            data = json.dumps(payload).encode("utf-8")
+            reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                      500: "Internal Server Error", 503: "Service Unavailable"}[status]
+            writer.write(
+                f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if path == "/stats":
+            if method != "GET":
+                return 405, {"error": "Use GET for /stats"}
+            return 200, self.stats()
+        if path == "/evaluate":
+            if method != "POST":
+                return 405, {"error": "Use POST for /evaluate"}
+            try:
+                scenario = json.loads(body)
+            except ValueError as error:
+                return 400, {"error": f"Invalid JSON: {error}"}
+            try:
+                return 200, await self.evaluate(scenario)
+            except (ValueError, TypeError) as error:
+                # Invalid scenario or parameters rejected by the LCA model
+                return 400, {"error": str(error)}
+            except ServiceUnavailableError as error:
+                return 503, {"error": str(error)}
+            except Exception as error:
+                return 500, {"error": f"{type(error).__name__}: {error}"}
+        return 404, {"error": f"Unknown path: {path}"}
+
+
+class SAF_Evaluation_Client:
+    """
+    Minimal local HTTP client for SAF_Evaluation_Service
+    """
+
+    def __init__(self, host="127.0.0.1", port=8000):
+        self.host = host
+        self.port = port
+
+    async def _request(self, method, path, payload=None):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+            writer.write(
+                f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+
+        head, _, data = response.partition(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        result = json.loads(data)
+        if status == 503:
+            raise ServiceUnavailableError(f"HTTP {status}: {result.get('error')}")
+        if status >= 500:
+            raise RuntimeError(f"HTTP {status}: {result.get('error')}")
+        if status != 200:
+            raise ValueError(f"HTTP {status}: {result.get('error')}")
+        return result
+
+    async def evaluate(self, scenario):
+        """Evaluate one scenario and return its results"""
+        return await self._request("POST", "/evaluate", scenario)
+
+    async def stats(self):
+        """Return the service metrics"""
+        return await self._request("GET", "/stats")
+
+
+# Example usage
+if __name__ == "__main__":
+    base_scenario = {
+        "pathway": "FT",
+        "functional_unit": "MJ",
+        "co2_source": "DAC",
+        "use_phase": {"combustion_emissions": 0.0, "energy_density": 43.0},
+        "carbon_capture": {
+            "capture_efficiency": 80.0, "energy_requirement": 30.0, "ghg_emissions": 0.08,
+            "water_usage": 5.0, "co2_capture_rate": 3.1
+        },
+        "electrolysis": {
+            "co2_electrolysis_efficiency": 65.0, "water_electrolysis_efficiency": 75.0,
+            "electricity_source": "renewable", "energy_input_co": 28.0, "energy_input_h2": 55.0,
+            "water_usage": 20.0
+        },
+        "conversion": {
+            "technology": "Fischer-Tropsch", "efficiency": 0.65, "ghg_emissions": 0.2,
+            "energy_input": 25.0, "water_usage": 5.0, "syngas_requirement": 2.13, "co_h2_ratio": 0.923
+        },
+        "distribution": {
+            "transport_distance": 500.0, "transport_mode": "truck", "ghg_emissions": 0.05,
+            "energy_input": 2.0
+        }
+    }
+
+    async def main():
+        async with SAF_Evaluation_Service(max_batch_size=128, max_latency=0.01) as service:
+            host, port = await service.serve()
+            client = SAF_Evaluation_Client(host, port)
+
+            # Issue concurrent requests with different electricity sources
+            sources = list(SAF_LCA_Model.electricity_carbon_intensities)
+            scenarios = []
+            for i in range(200):
+                scenario = json.loads(json.dumps(base_scenario))
+                scenario["electrolysis"]["electricity_source"] = sources[i % len(sources)]
+                scenarios.append(scenario)
+            results = await asyncio.gather(*(client.evaluate(s) for s in scenarios))
+
+            print("\nTotal GHG emissions (g CO2e/MJ) by electricity source:")
+            for source, result in list(zip(sources, results))[:len(sources)]:
+                print(f"  {source}: {result['ghg_emissions']['total']*1000:.2f}")
+
+            print("\nService metrics:")
+            for name, value in (await client.stats()).items():
+                print(f"  {name}: {value}")
+
+    asyncio.run(main())
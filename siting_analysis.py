@@ -0,0 +1,362 @@
+#%%
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+
+from LCA_calculation import SAF_LCA_Model
+
+
+class SAF_Siting_Analysis:
+    """
+    Geospatial siting analysis for SAF plants over memory-mapped raster inputs
+    """
+
+    # Raster layers understood by the analysis and their units
+    LAYERS = {
+        "carbon_intensity": "kg CO2e/kWh",
+        "power_price": "$/kWh",
+        "water_stress": "-",
+        "airport_distance": "km"
+    }
+
+    # Result rasters written by run()
+    OUTPUTS = [
+        "ghg_total",
+        "emission_reduction",
+        "energy_total",
+        "water_total",
+        "water_scarcity",
+        "electricity_cost"
+    ]
+
+    def __init__(self, model, rasters, tile_size=1024, fossil_jet_emissions=89.0):
+        """
+        Initialize the siting analysis
+
+        Parameters:
+        -----------
+        model : SAF_LCA_Model
+            Fully parameterized LCA model. Its values are used for every cell
+            and are only overridden by the raster layers that are provided.
+        rasters : dict
+            Mapping of layer name to raster. Each raster is either a path to a
+            2-D .npy file (opened with memory mapping) or an array-like.
+            "carbon_intensity" is required; "power_price", "water_stress" and
+            "airport_distance" are optional. NaN marks cells without data.
+        tile_size : int
+            Edge length (cells) of the square tiles processed at a time
+        fossil_jet_emissions : float
+            Life cycle GHG emissions of fossil jet fuel (g CO2e/MJ)
+        """
+        if not all([model.carbon_capture_data, model.electrolysis_data,
+                    model.conversion_data, model.distribution_data, model.use_phase_data]):
+            raise ValueError("Model must be fully parameterized before siting analysis")
+
+        unknown = set(rasters) - set(self.LAYERS)
+        if unknown:
+            raise ValueError(f"Unsupported raster layers: {sorted(unknown)}")
+        if "carbon_intensity" not in rasters:
+            raise ValueError("A 'carbon_intensity' raster is required")
+        if tile_size <= 0:
+            raise ValueError("tile_size must be positive")
+
+        self.model = model
+        self.tile_size = tile_size
+        self.fossil_jet_emissions = fossil_jet_emissions
+
+        # Open every layer lazily; .npy files are memory mapped, never loaded
+        self.rasters = {name: self.open_raster(source) for name, source in rasters.items()}
+
+        shapes = {raster.shape for raster in self.rasters.values()}
+        if len(shapes) != 1:
+            raise ValueError(f"All raster layers must share the same shape, got {sorted(shapes)}")
+        self.shape = shapes.pop()
+        if len(self.shape) != 2:
+            raise ValueError(f"Raster layers must be 2-D, got shape {self.shape}")
+
+        # Reference distance used to scale distribution burdens per cell
+        if "airport_distance" in self.rasters and not model.distribution_data["transport_distance"]:
+            raise ValueError("Model transport_distance must be non-zero to scale by airport_distance")
+
+        # Working copy that receives the per-tile arrays
+        self._cell_model = copy.deepcopy(model)
+
+    @staticmethod
+    def open_raster(source):
+        """
+        Open a raster layer without reading it into memory
+
+        Parameters:
+        -----------
+        source : str or array-like
+            Path to a .npy file or an array (numpy.memmap arrays are kept as is)
+
+        Returns:
+        --------
+        ndarray: Memory-mapped (or in-memory) 2-D array
+        """
+        if isinstance(source, (str, os.PathLike)):
+            return np.load(source, mmap_mode="r")
+        if isinstance(source, np.ndarray):
+            return source
+        return np.asarray(source)
+
+    def iter_tiles(self):
+        """
+        Iterate over the raster in square tiles
+
+        Yields:
+        -------
+        tuple: (row_slice, col_slice) for each tile
+        """
+        rows, cols = self.shape
+        for r0 in range(0, rows, self.tile_size):
+            for c0 in range(0, cols, self.tile_size):
+                yield (slice(r0, min(r0 + self.tile_size, rows)),
+                       slice(c0, min(c0 + self.tile_size, cols)))
+
+    def evaluate_cells(self, carbon_intensity, power_price=None, water_stress=None,
+                       airport_distance=None):
+        """
+        Run the LCA for a block of cells in a single vectorized pass
+
+        Parameters:
+        -----------
+        carbon_intensity : ndarray
+            Electricity carbon intensity (kg CO2e/kWh)
+        power_price : ndarray, optional
+            Electricity price ($/kWh). Without it electricity_cost is NaN.
+        water_stress : ndarray, optional
+            Water stress characterization factor (-). Defaults to 1.
+        airport_distance : ndarray, optional
+            Distance to the nearest airport (km). Defaults to the model's
+            transport_distance.
+
+        Returns:
+        --------
+        dict: Result arrays keyed by the names in OUTPUTS
+        """
+        model = self._cell_model
+        base = self.model
+        carbon_intensity = np.asarray(carbon_intensity, dtype=float)
+
+        model.set_electrolysis_data(
+            co2_electrolysis_efficiency=base.electrolysis_data["co2_electrolysis_efficiency"],
+            water_electrolysis_efficiency=base.electrolysis_data["water_electrolysis_efficiency"],
+            electricity_source=base.electrolysis_data["electricity_source"],
+            energy_input_co=base.electrolysis_data["energy_input_co"],
+            energy_input_h2=base.electrolysis_data["energy_input_h2"],
+            water_usage=base.electrolysis_data["water_usage"],
+            electricity_carbon_intensity=carbon_intensity
+        )
+
+        # Distribution burdens are given per kg fuel for the reference distance,
+        # so scale them linearly with the distance to the airport
+        if airport_distance is not None:
+            distance_factor = np.asarray(airport_distance, dtype=float) / base.distribution_data["transport_distance"]
+            model.set_distribution_data(
+                transport_distance=np.asarray(airport_distance, dtype=float),
+                transport_mode=base.distribution_data["transport_mode"],
+                ghg_emissions=base.distribution_data["ghg_emissions"] * distance_factor,
+                energy_input=base.distribution_data["energy_input"] * distance_factor
+            )
+        else:
+            # Drop arrays left over from a previous call on the working copy
+            model.set_distribution_data(**base.distribution_data)
+
+        results = model.calculate_lca()
+        shape = carbon_intensity.shape
+
+        # Convert results to g CO2e/MJ for comparison with fossil jet fuel
+        if model.functional_unit == "MJ":
+            saf_emissions = results["ghg_emissions"]["total"] * 1000  # kg to g
+        else:
+            energy_density = model.use_phase_data["energy_density"]  # MJ/kg
+            saf_emissions = results["ghg_emissions"]["total"] * 1000 / energy_density
+        emission_reduction = (self.fossil_jet_emissions - saf_emissions) / self.fossil_jet_emissions * 100
+
+        water_total = results["water_usage"]["total"]
+        if water_stress is not None:
+            water_scarcity = water_total * np.asarray(water_stress, dtype=float)
+        else:
+            water_scarcity = water_total
+
+        # Electricity-driven operating cost: DAC and electrolysis draw power
+        electricity_kwh = (results["energy_consumption"]["carbon_capture"]
+                           + results["energy_consumption"]["electrolysis"]) / 3.6  # 1 kWh = 3.6 MJ
+        if power_price is not None:
+            electricity_cost = electricity_kwh * np.asarray(power_price, dtype=float)
+        else:
+            electricity_cost = np.nan
+
+        outputs = {
+            "ghg_total": results["ghg_emissions"]["total"],
+            "emission_reduction": emission_reduction,
+            "energy_total": results["energy_consumption"]["total"],
+            "water_total": water_total,
+            "water_scarcity": water_scarcity,
+            "electricity_cost": electricity_cost
+        }
+
+        # NaN in any input layer marks a cell without data
+        nodata = np.isnan(carbon_intensity)
+        for layer in (power_price, water_stress, airport_distance):
+            if layer is not None:
+                nodata |= np.isnan(np.asarray(layer, dtype=float))
+
+        for name, value in outputs.items():
+            value = np.broadcast_to(np.asarray(value, dtype=float), shape).copy()
+            value[nodata] = np.nan
+            outputs[name] = value
+
+        return outputs
+
+    def run(self, output_dir, rank_by="ghg_total", top_n=100, ascending=True,
+            max_water_stress=None, transform=None, dtype=np.float32):
+        """
+        Evaluate every cell tile by tile and write result rasters and a ranked site list
+
+        Parameters:
+        -----------
+        output_dir : str
+            Directory receiving one <output>.npy raster per entry of OUTPUTS
+            and the ranked site list "ranked_sites.csv"
+        rank_by : str
+            Output used to rank candidate sites
+        top_n : int
+            Number of sites kept in the ranked list
+        ascending : bool
+            Rank smallest values first (True for emissions, costs and water)
+        max_water_stress : float, optional
+            Exclude cells whose water stress exceeds this value from the ranking
+        transform : tuple, optional
+            (x_origin, pixel_width, y_origin, pixel_height) used to report the
+            coordinates of cell centres in the ranked list
+        dtype : numpy dtype
+            Data type of the result rasters
+
+        Returns:
+        --------
+        DataFrame: Ranked candidate sites
+        """
+        if rank_by not in self.OUTPUTS:
+            raise ValueError(f"Unsupported ranking output: {rank_by}")
+        if rank_by == "electricity_cost" and "power_price" not in self.rasters:
+            raise ValueError("Ranking by electricity_cost requires a 'power_price' raster")
+        if max_water_stress is not None and "water_stress" not in self.rasters:
+            raise ValueError("max_water_stress requires a 'water_stress' raster")
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Result rasters are created as memory-mapped .npy files and filled per tile
+        outputs = {
+            name: np.lib.format.open_memmap(os.path.join(output_dir, f"{name}.npy"),
+                                            mode="w+", dtype=dtype, shape=self.shape)
+            for name in self.OUTPUTS
+        }
+
+        # Running best candidates: (score, flat cell index)
+        best_scores = np.empty(0)
+        best_cells = np.empty(0, dtype=np.int64)
+        sign = 1.0 if ascending else -1.0
+
+        for rows, cols in self.iter_tiles():
+            layers = {name: np.asarray(raster[rows, cols], dtype=float)
+                      for name, raster in self.rasters.items()}
+            tile_results = self.evaluate_cells(**layers)
+
+            for name, value in tile_results.items():
+                outputs[name][rows, cols] = value
+
+            # Keep only the best top_n cells of this tile before merging
+            score = sign * tile_results[rank_by]
+            valid = ~np.isnan(score)
+            if max_water_stress is not None:
+                valid &= layers["water_stress"] <= max_water_stress
+            local_rows, local_cols = np.nonzero(valid)
+            if local_rows.size == 0 or top_n <= 0:
+                continue
+            scores = score[local_rows, local_cols]
+            cells = np.ravel_multi_index((local_rows + rows.start, local_cols + cols.start), self.shape)
+            if scores.size > top_n:
+                keep = np.argpartition(scores, top_n - 1)[:top_n]
+                scores, cells = scores[keep], cells[keep]
+
+            best_scores = np.concatenate([best_scores, scores])
+            best_cells = np.concatenate([best_cells, cells])
+            if best_scores.size > top_n:
+                keep = np.argpartition(best_scores, top_n - 1)[:top_n]
+                best_scores, best_cells = best_scores[keep], best_cells[keep]
+
+        for raster in outputs.values():
+            raster.flush()
+
+        # Assemble the ranked site list from the written rasters
+        order = np.lexsort((best_cells, best_scores))
+        best_cells = best_cells[order]
+        site_rows, site_cols = np.unravel_index(best_cells, self.shape)
+
+        sites = pd.DataFrame({"rank": np.arange(1, best_cells.size + 1), "row": site_rows, "col": site_cols})
+        if transform is not None:
+            x_origin, pixel_width, y_origin, pixel_height = transform
+            sites["x"] = x_origin + (site_cols + 0.5) * pixel_width
+            sites["y"] = y_origin + (site_rows + 0.5) * pixel_height
+        for name, raster in self.rasters.items():
+            sites[name] = np.asarray(raster[site_rows, site_cols], dtype=float)
+        for name in self.OUTPUTS:
+            sites[name] = np.asarray(outputs[name][site_rows, site_cols], dtype=float)
+
+        sites.to_csv(os.path.join(output_dir, "ranked_sites.csv"), index=False)
+
+        del outputs
+        return sites
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    model = SAF_LCA_Model(pathway="FT", functional_unit="MJ", co2_source="DAC")
+    model.set_use_phase_data(combustion_emissions=0.0, energy_density=43.0)
+    model.set_carbon_capture_data(
+        capture_efficiency=80.0, energy_requirement=30.0, ghg_emissions=0.08,
+        water_usage=5.0, co2_capture_rate=3.1
+    )
+    model.set_electrolysis_data(
+        co2_electrolysis_efficiency=65.0, water_electrolysis_efficiency=75.0,
+        electricity_source="renewable", energy_input_co=28.0, energy_input_h2=55.0,
+        water_usage=20.0, electricity_carbon_intensity=None
+    )
+    model.set_conversion_data(
+        technology="Fischer-Tropsch", efficiency=0.65, ghg_emissions=0.2,
+        energy_input=25.0, water_usage=5.0, syngas_requirement=2.13, co_h2_ratio=0.923
+    )
+    model.set_distribution_data(
+        transport_distance=500.0, transport_mode="truck", ghg_emissions=0.05, energy_input=2.0
+    )
+
+    # Synthetic 1 km rasters stored as .npy files (illustrative values)
+    rng = np.random.default_rng(0)
+    shape = (2000, 3000)
+    work_dir = tempfile.mkdtemp()
+    layers = {
+        "carbon_intensity": rng.uniform(0.01, 0.8, shape),
+        "power_price": rng.uniform(0.02, 0.12, shape),
+        "water_stress": rng.uniform(0.1, 5.0, shape),
+        "airport_distance": rng.uniform(5.0, 800.0, shape)
+    }
+    paths = {}
+    for name, values in layers.items():
+        paths[name] = os.path.join(work_dir, f"{name}.npy")
+        np.save(paths[name], values)
+    del layers
+
+    siting = SAF_Siting_Analysis(model, paths, tile_size=512)
+    sites = siting.run(os.path.join(work_dir, "results"), rank_by="ghg_total",
+                       top_n=20, max_water_stress=2.0)
+
+    print(f"\nResults written to {os.path.join(work_dir, 'results')}")
+    print("\nTop candidate sites:")
+    print(sites.head(10).to_string(index=False))
@@ -0,0 +1,644 @@
+#%%
+import collections
+import concurrent.futures
+import glob
+import hashlib
+import json
+import math
+import os
+import socket
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from evaluation_service import SCENARIO_MODEL_KEYS, SCENARIO_STAGES, evaluate_stacked
+
+
+class SAF_Sweep:
+    """
+    Deterministic scenario space for large LCA sweeps, split into fixed-size shards
+    """
+
+    # Supported Monte Carlo distributions and their parameters
+    DISTRIBUTIONS = {
+        "normal": ("mean", "std"),
+        "uniform": ("low", "high"),
+        "triangular": ("left", "mode", "right"),
+        "lognormal": ("mean", "sigma")
+    }
+
+    def __init__(self, base_scenario, axes=None, monte_carlo=None, n_draws=1,
+                 shard_size=100000, seed=0, fossil_jet_emissions=89.0):
+        """
+        Define the sweep
+
+        Parameters:
+        -----------
+        base_scenario : dict
+            Scenario in the format of evaluation_service.evaluate_scenarios
+        axes : dict, optional
+            Grid axes combined as a full factorial. A key of the form
+            "stage.parameter" maps to a list of values for that parameter
+            (e.g. {"electrolysis.electricity_source": ["wind", "coal"]} or one
+            electricity_carbon_intensity per siting cell). Any other key names
+            a case axis whose items are dicts of "stage.parameter" overrides.
+        monte_carlo : dict, optional
+            "stage.parameter" -> (distribution, *params), e.g.
+            {"carbon_capture.energy_requirement": ("normal", 30.0, 3.0)}
+        n_draws : int
+            Monte Carlo draws per grid point
+        shard_size : int
+            Number of evaluations per shard (work unit)
+        seed : int
+            Seed of the Monte Carlo draws; each shard derives its own stream
+        fossil_jet_emissions : float
+            Life cycle GHG emissions of fossil jet fuel (g CO2e/MJ)
+        """
+        self.base_scenario = json.loads(json.dumps(base_scenario))
+        self.axes = {name: list(np.asarray(values).tolist()) if name.count(".") == 1 else list(values)
+                     for name, values in (axes or {}).items()}
+        self.monte_carlo = {path: tuple(spec) for path, spec in (monte_carlo or {}).items()}
+        self.n_draws = n_draws
+        self.shard_size = shard_size
+        self.seed = seed
+        self.fossil_jet_emissions = fossil_jet_emissions
+
+        if n_draws <= 0 or shard_size <= 0:
+            raise ValueError("n_draws and shard_size must be positive")
+        for name, values in self.axes.items():
+            if not values:
+                raise ValueError(f"Axis '{name}' is empty")
+            paths = [name] if name.count(".") == 1 else [path for case in values for path in case]
+            for path in paths:
+                self._check_path(path)
+        for path, spec in self.monte_carlo.items():
+            self._check_path(path)
+            if spec[0] not in self.DISTRIBUTIONS or len(spec) != len(self.DISTRIBUTIONS[spec[0]]) + 1:
+                raise ValueError(f"Unsupported Monte Carlo specification for '{path}': {spec}")
+
+        # A parameter set by two axes (or an axis and a Monte Carlo draw) would be
+        # overwritten by the later one while both columns label the rows
+        owners = collections.defaultdict(list)
+        for name, values in self.axes.items():
+            paths = [name] if name.count(".") == 1 else {path for case in values for path in case}
+            for path in paths:
+                owners[path].append(f"axis '{name}'")
+        for path in self.monte_carlo:
+            owners[path].append("monte_carlo")
+        overlapping = {path: sources for path, sources in owners.items() if len(sources) > 1}
+        if overlapping:
+            details = "; ".join(f"{path}: {', '.join(sources)}" for path, sources in sorted(overlapping.items()))
+            raise ValueError(f"Parameters swept more than once: {details}")
+        swept = set(owners)
+
+        # A given intensity takes precedence over the source, which would make the axis a no-op
+        if ("electrolysis.electricity_source" in swept
+                and self.base_scenario["electrolysis"].get("electricity_carbon_intensity") is not None):
+            raise ValueError("Sweeping electrolysis.electricity_source has no effect while the base "
+                             "scenario sets electricity_carbon_intensity; remove it from the base scenario")
+
+        self.axis_sizes = [len(values) for values in self.axes.values()]
+        self.n_points = math.prod(self.axis_sizes)
+        self.n_units = self.n_points * n_draws
+        self.n_shards = -(-self.n_units // shard_size)
+
+        # Fail fast on an invalid scenario rather than inside the workers
+        self.evaluate_shard(0, limit=1)
+
+    def _check_path(self, path):
+        stage, _, parameter = path.partition(".")
+        if stage not in SCENARIO_STAGES or not parameter:
+            raise ValueError(f"Invalid parameter path '{path}', expected 'stage.parameter'")
+        if stage not in self.base_scenario:
+            raise ValueError(f"Base scenario has no '{stage}' section for '{path}'")
+
+    def config(self):
+        """
+        Plain-data description of the sweep, used to recognize its checkpoints
+
+        Axes and Monte Carlo specifications are ordered lists of [name, values]
+        pairs: their order defines the index-to-scenario mapping and the order
+        of the random draws, so it must be part of the fingerprint.
+        """
+        return {
+            "base_scenario": self.base_scenario,
+            "axes": [[name, values] for name, values in self.axes.items()],
+            "monte_carlo": [[path, list(spec)] for path, spec in self.monte_carlo.items()],
+            "n_draws": self.n_draws,
+            "shard_size": self.shard_size,
+            "seed": self.seed,
+            "fossil_jet_emissions": self.fossil_jet_emissions
+        }
+
+    def fingerprint(self):
+        """Hash of the sweep configuration"""
+        return hashlib.sha256(json.dumps(self.config(), sort_keys=True).encode("utf-8")).hexdigest()
+
+    def shard_bounds(self, shard):
+        """First and last (exclusive) evaluation index of a shard"""
+        if not 0 <= shard < self.n_shards:
+            raise IndexError(f"Shard {shard} out of range (0-{self.n_shards - 1})")
+        return shard * self.shard_size, min((shard + 1) * self.shard_size, self.n_units)
+
+    def _sample(self, rng, spec, size):
+        distribution, *params = spec
+        if distribution == "normal":
+            return rng.normal(params[0], params[1], size)
+        if distribution == "uniform":
+            return rng.uniform(params[0], params[1], size)
+        if distribution == "triangular":
+            return rng.triangular(params[0], params[1], params[2], size)
+        return rng.lognormal(params[0], params[1], size)
+
+    def evaluate_shard(self, shard, limit=None):
+        """
+        Evaluate all scenarios of a shard in one vectorized pass
+
+        Parameters:
+        -----------
+        shard : int
+            Shard index
+        limit : int, optional
+            Evaluate only the first limit scenarios of the shard
+
+        Returns:
+        --------
+        dict: Column name -> array with the index, grid coordinates, sampled
+        values and results of every scenario in the shard
+        """
+        start, stop = self.shard_bounds(shard)
+        if limit is not None:
+            stop = min(stop, start + limit)
+        index = np.arange(start, stop, dtype=np.int64)
+        size = index.size
+
+        columns = {"index": index, "draw": index % self.n_draws}
+        scenario = {key: self.base_scenario[key] for key in SCENARIO_MODEL_KEYS if key in self.base_scenario}
+        for stage in SCENARIO_STAGES:
+            if stage in self.base_scenario:
+                scenario[stage] = dict(self.base_scenario[stage])
+
+        # Grid axes: full factorial over the flattened point index
+        if self.axes:
+            coordinates = np.unravel_index(index // self.n_draws, self.axis_sizes)
+            for (name, values), position in zip(self.axes.items(), coordinates):
+                if name.count(".") == 1:
+                    stage, parameter = name.split(".")
+                    chosen = np.asarray(values)[position]
+                    scenario[stage][parameter] = chosen
+                    columns[name] = chosen
+                    continue
+                columns[name] = position
+                for path in {path for case in values for path in case}:
+                    stage, parameter = path.split(".")
+                    base = self.base_scenario[stage].get(parameter)
+                    chosen = np.asarray([case.get(path, base) for case in values])[position]
+                    scenario[stage][parameter] = chosen
+
+        # Monte Carlo draws, from a stream that depends only on the seed and shard
+        rng = np.random.default_rng([self.seed, shard])
+        for path, spec in self.monte_carlo.items():
+            stage, parameter = path.split(".")
+            sampled = self._sample(rng, spec, self.shard_size)[:size]
+            scenario[stage][parameter] = sampled
+            columns[path] = sampled
+
+        # Numeric parameters that stayed scalar are broadcast by numpy
+        stacked = evaluate_stacked(scenario, size, self.fossil_jet_emissions)
+        for category, stages in stacked.items():
+            if category == "emission_reduction":
+                columns[category] = np.array(stages)
+                continue
+            for stage, value in stages.items():
+                columns[f"{category}.{stage}"] = np.array(value)
+
+        return columns
+
+
+def _tmp_suffix():
+    """Suffix of temporary checkpoint files, unique per host and process"""
+    return f".{socket.gethostname()}.{os.getpid()}.tmp"
+
+
+def _process_alive(pid):
+    """True if a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _run_shard(sweep, shard, checkpoint_dir, run_id, n_workers):
+    """
+    Evaluate one shard and checkpoint it (executed in the worker processes)
+    """
+    started = time.time()
+    timer = time.perf_counter()
+    columns = sweep.evaluate_shard(shard)
+    compute_time = time.perf_counter() - timer
+
+    # Write to temporary files first so a crash never leaves a partial shard
+    shard_path = os.path.join(checkpoint_dir, "shards", f"shard_{shard:06d}.npz")
+    metrics_path = os.path.join(checkpoint_dir, "metrics", f"shard_{shard:06d}.json")
+    tmp_suffix = _tmp_suffix()
+    tmp_path = f"{shard_path}{tmp_suffix}"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **columns)
+    write_time = time.perf_counter() - timer - compute_time
+
+    evaluations = columns["index"].size
+    metrics = {
+        "shard": shard,
+        "evaluations": int(evaluations),
+        "compute_time_s": compute_time,
+        "write_time_s": write_time,
+        "wall_time_s": compute_time + write_time,
+        "throughput_per_s": evaluations / compute_time if compute_time > 0 else float("inf"),
+        "started_at": started,
+        "finished_at": time.time(),
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "run_id": run_id,
+        "n_workers": n_workers
+    }
+    with open(f"{metrics_path}{tmp_suffix}", "w") as f:
+        json.dump(metrics, f)
+    os.replace(f"{metrics_path}{tmp_suffix}", metrics_path)
+
+    # The shard file is the completion marker, so it is moved into place last
+    os.replace(tmp_path, shard_path)
+    return metrics
+
+
+class SAF_Sweep_Runner:
+    """
+    Fault-tolerant, checkpointed runner for SAF_Sweep on local worker processes
+    """
+
+    def __init__(self, sweep, checkpoint_dir, n_workers=None, node_index=0, n_nodes=1,
+                 max_retries=2):
+        """
+        Initialize the runner
+
+        Parameters:
+        -----------
+        sweep : SAF_Sweep
+            Scenario space to evaluate
+        checkpoint_dir : str
+            Directory holding the manifest, completed shards and shard metrics.
+            Nodes of a multi-node run share it (e.g. on a network file system).
+        n_workers : int, optional
+            Number of worker processes (defaults to the CPU count)
+        node_index : int
+            Index of this node in a multi-node run
+        n_nodes : int
+            Number of nodes; shard k is run by node k % n_nodes
+        max_retries : int
+            Retries per shard after an error or a crashed worker
+        """
+        if not 0 <= node_index < n_nodes:
+            raise ValueError("node_index must be in the range 0 to n_nodes - 1")
+
+        self.sweep = sweep
+        self.checkpoint_dir = checkpoint_dir
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.node_index = node_index
+        self.n_nodes = n_nodes
+        self.max_retries = max_retries
+        self._run_id = None
+
+        os.makedirs(os.path.join(checkpoint_dir, "shards"), exist_ok=True)
+        os.makedirs(os.path.join(checkpoint_dir, "metrics"), exist_ok=True)
+        self._remove_stale_files()
+        self._write_manifest()
+
+    def _remove_stale_files(self):
+        """Delete temporary files left behind by crashed workers on this host"""
+        pattern = f".{socket.gethostname()}.*.tmp"
+        for directory in ("", "shards", "metrics"):
+            for path in glob.glob(os.path.join(self.checkpoint_dir, directory, f"*{pattern}")):
+                # Files of live processes belong to another runner sharing the directory
+                pid = path.rsplit(".", 2)[1]
+                if not pid.isdigit() or _process_alive(int(pid)):
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _write_manifest(self):
+        manifest_path = os.path.join(self.checkpoint_dir, "manifest.json")
+        manifest = {
+            "fingerprint": self.sweep.fingerprint(),
+            "n_units": self.sweep.n_units,
+            "n_shards": self.sweep.n_shards,
+            "shard_size": self.sweep.shard_size,
+            "config": self.sweep.config()
+        }
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                existing = json.load(f)
+            if existing["fingerprint"] != manifest["fingerprint"]:
+                raise ValueError(f"Checkpoint directory {self.checkpoint_dir} belongs to a different sweep")
+            return
+        tmp_path = f"{manifest_path}{_tmp_suffix()}"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    def _shard_path(self, shard):
+        return os.path.join(self.checkpoint_dir, "shards", f"shard_{shard:06d}.npz")
+
+    def completed_shards(self):
+        """Indices of all checkpointed shards (from every node)"""
+        return sorted(int(os.path.basename(path)[len("shard_"):-len(".npz")])
+                      for path in glob.glob(os.path.join(self.checkpoint_dir, "shards", "shard_*.npz")))
+
+    def pending_shards(self):
+        """Indices of this node's shards that have not been checkpointed yet"""
+        completed = set(self.completed_shards())
+        return [shard for shard in range(self.node_index, self.sweep.n_shards, self.n_nodes)
+                if shard not in completed]
+
+    def _run_pool(self, shards, n_workers, on_complete):
+        """
+        Run shards on a fresh process pool with at most n_workers shards in flight
+
+        Returns:
+        --------
+        tuple: (errors, crashed, not_started) where errors maps shards that
+        raised to their exception, crashed lists the shards that were running
+        when a worker died and not_started the shards never submitted
+        """
+        queue = collections.deque(shards)
+        in_flight = {}
+        errors = {}
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as pool:
+                while queue or in_flight:
+                    while queue and len(in_flight) < n_workers:
+                        shard = queue.popleft()
+                        in_flight[pool.submit(_run_shard, self.sweep, shard, self.checkpoint_dir,
+                                              self._run_id, self.n_workers)] = shard
+                    done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            metrics = future.result()
+                        except BrokenProcessPool:
+                            raise
+                        except Exception as error:
+                            errors[in_flight.pop(future)] = error
+                        else:
+                            in_flight.pop(future)
+                            on_complete(metrics)
+        except BrokenProcessPool:
+            # Shards that finished writing before the pool broke are complete
+            checkpointed = set(self.completed_shards())
+            crashed = []
+            for shard in sorted(in_flight.values()):
+                if shard not in checkpointed:
+                    crashed.append(shard)
+                    continue
+                with open(os.path.join(self.checkpoint_dir, "metrics", f"shard_{shard:06d}.json")) as f:
+                    on_complete(json.load(f))
+            return errors, crashed, list(queue)
+        return errors, [], []
+
+    def run(self, verbose=False):
+        """
+        Run all pending shards of this node, resuming from existing checkpoints
+
+        When a worker process dies, only the shards that were running at the
+        time are suspect. Each is re-run alone in a fresh single-worker pool
+        so that a shard that keeps crashing uses up only its own retries;
+        shards that were still queued are resubmitted without counting an
+        attempt.
+
+        Parameters:
+        -----------
+        verbose : bool
+            Print progress after every shard
+
+        Returns:
+        --------
+        DataFrame: Metrics of the shards completed in this call
+        """
+        pending = self.pending_shards()
+        total = len(pending)
+        attempts = collections.Counter()
+        completed = []
+        failures = {}
+        run_started = time.perf_counter()
+        self._run_id = uuid.uuid4().hex
+
+        def on_complete(metrics):
+            metrics["attempt"] = attempts[metrics["shard"]] + 1
+            completed.append(metrics)
+            if verbose:
+                print(f"Shard {metrics['shard']} done: {metrics['evaluations']} evaluations "
+                      f"in {metrics['wall_time_s']:.2f} s ({len(completed)}/{total} this run)")
+
+        def record_failure(shard, error):
+            """Count a failed attempt; True if the shard may be retried"""
+            attempts[shard] += 1
+            if attempts[shard] > self.max_retries:
+                failures[shard] = error
+                return False
+            return True
+
+        while pending:
+            errors, crashed, not_started = self._run_pool(pending, self.n_workers, on_complete)
+            retry = [shard for shard, error in errors.items() if record_failure(shard, error)]
+
+            # Isolate the shards that were running when a worker died
+            for shard in crashed:
+                while True:
+                    isolated_errors, isolated_crash, _ = self._run_pool([shard], 1, on_complete)
+                    if not isolated_errors and not isolated_crash:
+                        break
+                    error = isolated_errors.get(shard) or BrokenProcessPool(
+                        f"Worker process died while running shard {shard}")
+                    if not record_failure(shard, error):
+                        break
+
+            pending = sorted(retry + not_started)
+
+        if failures:
+            details = "; ".join(f"shard {shard}: {error!r}" for shard, error in sorted(failures.items()))
+            raise RuntimeError(f"{len(failures)} shard(s) failed after {self.max_retries} retries "
+                               f"(completed shards are checkpointed, run again to resume): {details}")
+
+        metrics = pd.DataFrame(completed)
+        if verbose and completed:
+            elapsed = time.perf_counter() - run_started
+            print(f"\n{metrics['evaluations'].sum()} evaluations in {elapsed:.2f} s "
+                  f"({metrics['evaluations'].sum() / elapsed:.0f}/s with {self.n_workers} workers)")
+        return metrics
+
+    def is_complete(self):
+        """True once every shard of the sweep (on all nodes) is checkpointed"""
+        return len(self.completed_shards()) == self.sweep.n_shards
+
+    def iter_results(self):
+        """
+        Iterate over the checkpointed shards in order
+
+        Yields:
+        -------
+        DataFrame: Results of one shard
+        """
+        for shard in self.completed_shards():
+            with np.load(self._shard_path(shard)) as data:
+                yield pd.DataFrame({name: data[name] for name in data.files})
+
+    def merge(self, output_path=None):
+        """
+        Merge the checkpointed shards
+
+        Parameters:
+        -----------
+        output_path : str, optional
+            CSV file written shard by shard. Use this for sweeps that do not
+            fit in memory; otherwise the merged DataFrame is returned.
+
+        Returns:
+        --------
+        DataFrame or None: All results ordered by evaluation index
+        """
+        if not self.is_complete():
+            missing = self.sweep.n_shards - len(self.completed_shards())
+            raise RuntimeError(f"Sweep incomplete: {missing} of {self.sweep.n_shards} shards missing")
+
+        if output_path is None:
+            return pd.concat(self.iter_results(), ignore_index=True)
+
+        for i, frame in enumerate(self.iter_results()):
+            frame.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        return None
+
+    def metrics(self):
+        """
+        Per-shard timing and throughput of every checkpointed shard
+
+        Returns:
+        --------
+        DataFrame: One row per shard, ordered by shard index
+        """
+        records = []
+        for shard in self.completed_shards():
+            path = os.path.join(self.checkpoint_dir, "metrics", f"shard_{shard:06d}.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    records.append(json.load(f))
+        return pd.DataFrame(records)
+
+    def scaling_summary(self):
+        """
+        Throughput summary to see where scaling breaks down
+
+        Efficiency is computed per run (one call of run() on one node) as busy
+        time over run span times the run's n_workers, so downtime between
+        resumed runs and the short-lived pools used to isolate crashing shards
+        do not distort it.
+
+        Returns:
+        --------
+        dict: Shards, evaluations, runs, largest worker count, active
+        wall-clock time, summed busy time, aggregate and per-shard
+        throughput, write share and parallel efficiency
+        """
+        metrics = self.metrics()
+        if metrics.empty:
+            return {}
+
+        runs = metrics.groupby("run_id").agg(
+            started_at=("started_at", "min"), finished_at=("finished_at", "max"),
+            busy_s=("wall_time_s", "sum"), n_workers=("n_workers", "max")
+        ).sort_values("started_at")
+        capacity = ((runs["finished_at"] - runs["started_at"]) * runs["n_workers"]).sum()
+
+        # Wall-clock time with at least one run active (runs of several nodes overlap)
+        elapsed = 0.0
+        active_until = -math.inf
+        for started, finished in zip(runs["started_at"], runs["finished_at"]):
+            elapsed += max(0.0, finished - max(started, active_until))
+            active_until = max(active_until, finished)
+
+        busy = metrics["wall_time_s"].sum()
+        evaluations = metrics["evaluations"].sum()
+        return {
+            "shards": len(metrics),
+            "evaluations": int(evaluations),
+            "runs": len(runs),
+            "workers": int(runs["n_workers"].max()),
+            "elapsed_s": elapsed,
+            "busy_s": busy,
+            "aggregate_throughput_per_s": evaluations / elapsed if elapsed > 0 else float("inf"),
+            "median_shard_throughput_per_s": float(metrics["throughput_per_s"].median()),
+            "write_share": metrics["write_time_s"].sum() / busy if busy > 0 else 0.0,
+            "parallel_efficiency": busy / capacity if capacity > 0 else 1.0
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    base_scenario = {
+        "pathway": "FT",
+        "functional_unit": "MJ",
+        "co2_source": "DAC",
+        "use_phase": {"combustion_emissions": 0.0, "energy_density": 43.0},
+        "carbon_capture": {
+            "capture_efficiency": 80.0, "energy_requirement": 30.0, "ghg_emissions": 0.08,
+            "water_usage": 5.0, "co2_capture_rate": 3.1
+        },
+        "electrolysis": {
+            "co2_electrolysis_efficiency": 65.0, "water_electrolysis_efficiency": 75.0,
+            "electricity_source": "renewable", "energy_input_co": 28.0, "energy_input_h2": 55.0,
+            "water_usage": 20.0
+        },
+        "conversion": {
+            "technology": "Fischer-Tropsch", "efficiency": 0.65, "ghg_emissions": 0.2,
+            "energy_input": 25.0, "water_usage": 5.0, "syngas_requirement": 2.13, "co_h2_ratio": 0.923
+        },
+        "distribution": {
+            "transport_distance": 500.0, "transport_mode": "truck", "ghg_emissions": 0.05,
+            "energy_input": 2.0
+        }
+    }
+
+    sweep = SAF_Sweep(
+        base_scenario,
+        axes={
+            "electrolysis.electricity_source": ["renewable_mix", "grid_eu", "grid_china", "solar", "wind"],
+            "technology_case": [
+                {},
+                {"electrolysis.co2_electrolysis_efficiency": 75.0, "electrolysis.water_electrolysis_efficiency": 80.0}
+            ]
+        },
+        monte_carlo={
+            "carbon_capture.energy_requirement": ("normal", 30.0, 3.0),
+            "carbon_capture.capture_efficiency": ("triangular", 75.0, 80.0, 85.0)
+        },
+        n_draws=100000,
+        shard_size=50000
+    )
+
+    runner = SAF_Sweep_Runner(sweep, tempfile.mkdtemp(), n_workers=4)
+    runner.run(verbose=True)
+
+    results = runner.merge()
+    print("\nMean total GHG emissions (g CO2e/MJ):")
+    print((results.groupby(["electrolysis.electricity_source", "technology_case"])
+           ["ghg_emissions.total"].mean() * 1000).round(2).to_string())
+
+    print("\nScaling summary:")
+    for name, value in runner.scaling_summary().items():
+        print(f"  {name}: {value}")
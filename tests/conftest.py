@@ -0,0 +1,36 @@
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASE_SCENARIO = {
+    "pathway": "FT",
+    "functional_unit": "MJ",
+    "co2_source": "DAC",
+    "use_phase": {"combustion_emissions": 0.0, "energy_density": 43.0},
+    "carbon_capture": {
+        "capture_efficiency": 80.0, "energy_requirement": 30.0, "ghg_emissions": 0.08,
+        "water_usage": 5.0, "co2_capture_rate": 3.1
+    },
+    "electrolysis": {
+        "co2_electrolysis_efficiency": 65.0, "water_electrolysis_efficiency": 75.0,
+        "electricity_source": "renewable", "energy_input_co": 28.0, "energy_input_h2": 55.0,
+        "water_usage": 20.0
+    },
+    "conversion": {
+        "technology": "Fischer-Tropsch", "efficiency": 0.65, "ghg_emissions": 0.2,
+        "energy_input": 25.0, "water_usage": 5.0, "syngas_requirement": 2.13, "co_h2_ratio": 0.923
+    },
+    "distribution": {
+        "transport_distance": 500.0, "transport_mode": "truck", "ghg_emissions": 0.05,
+        "energy_input": 2.0
+    }
+}
+
+
+@pytest.fixture
+def base_scenario():
+    return copy.deepcopy(BASE_SCENARIO)
@@ -0,0 +1,158 @@
+import asyncio
+import copy
+import json
+
+import pytest
+
+import evaluation_service
+from LCA_calculation import SAF_LCA_Model
+from evaluation_service import (SAF_Evaluation_Client, SAF_Evaluation_Service, ServiceUnavailableError,
+                                evaluate_scenarios)
+
+SOURCES = ["wind", "solar", "grid_eu", "grid_china", "coal"]
+
+
+def scalar_results(scenario):
+    model = SAF_LCA_Model(pathway=scenario["pathway"], functional_unit=scenario["functional_unit"],
+                          co2_source=scenario["co2_source"])
+    model.set_use_phase_data(**scenario["use_phase"])
+    model.set_carbon_capture_data(**scenario["carbon_capture"])
+    model.set_electrolysis_data(**scenario["electrolysis"])
+    model.set_conversion_data(**scenario["conversion"])
+    model.set_distribution_data(**scenario["distribution"])
+    results = model.calculate_lca()
+    return results, model.calculate_emission_reduction()
+
+
+def run_with_client(coroutine, **service_kwargs):
+    async def main():
+        async with SAF_Evaluation_Service(**service_kwargs) as service:
+            host, port = await service.serve(port=0)
+            return await coroutine(service, SAF_Evaluation_Client(host, port))
+    return asyncio.run(main())
+
+
+def with_source(base_scenario, source):
+    scenario = copy.deepcopy(base_scenario)
+    scenario["electrolysis"]["electricity_source"] = source
+    return scenario
+
+
+def test_concurrent_requests_are_batched(base_scenario):
+    scenarios = [with_source(base_scenario, SOURCES[i % len(SOURCES)]) for i in range(40)]
+
+    async def scenario_run(service, client):
+        await asyncio.gather(*(client.evaluate(s) for s in scenarios))
+        return await client.stats()
+
+    stats = run_with_client(scenario_run, max_latency=0.05)
+    assert stats["requests"] == 40
+    assert stats["batches"] < 40
+
+
+def test_results_match_scalar_model(base_scenario):
+    scenarios = [with_source(base_scenario, source) for source in SOURCES]
+    scenarios[0]["carbon_capture"]["capture_efficiency"] = 70.0
+    scenarios[1]["functional_unit"] = "kg"
+
+    async def scenario_run(service, client):
+        return await asyncio.gather(*(client.evaluate(s) for s in scenarios))
+
+    responses = run_with_client(scenario_run, max_latency=0.05)
+    for scenario, response in zip(scenarios, responses):
+        expected, reduction = scalar_results(scenario)
+        for category, stages in expected.items():
+            for stage, value in stages.items():
+                assert response[category][stage] == pytest.approx(value)
+        assert response["emission_reduction"] == pytest.approx(reduction)
+
+
+def test_invalid_scenario_fails_only_its_caller(base_scenario):
+    invalid_type = copy.deepcopy(base_scenario)
+    invalid_type["conversion"]["ghg_emissions"] = "high"
+    zero_efficiency = copy.deepcopy(base_scenario)
+    zero_efficiency["carbon_capture"]["capture_efficiency"] = 0.0
+    scenarios = [base_scenario, invalid_type, with_source(base_scenario, "coal"), zero_efficiency]
+
+    async def scenario_run(service, client):
+        return await asyncio.gather(*(client.evaluate(s) for s in scenarios), return_exceptions=True)
+
+    responses = run_with_client(scenario_run, max_latency=0.05)
+    assert isinstance(responses[0], dict)
+    assert isinstance(responses[2], dict)
+    for response in (responses[1], responses[3]):
+        assert isinstance(response, ValueError)
+        assert "HTTP 400" in str(response)
+
+
+def test_stats_report_queue_depth_and_latency_percentiles(base_scenario):
+    async def scenario_run(service, client):
+        await asyncio.gather(*(client.evaluate(base_scenario) for _ in range(10)))
+        return await client.stats()
+
+    stats = run_with_client(scenario_run)
+    assert stats["queue_depth"] == 0
+    for name in ("latency_ms_p50", "latency_ms_p90", "latency_ms_p99"):
+        assert stats[name] is not None and stats[name] >= 0
+    assert stats["latency_ms_p50"] <= stats["latency_ms_p90"] <= stats["latency_ms_p99"]
+
+
+def test_invalid_content_length_returns_400():
+    async def scenario_run(service, client):
+        reader, writer = await asyncio.open_connection(client.host, client.port)
+        writer.write(b"POST /evaluate HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    response = run_with_client(scenario_run)
+    assert response.startswith(b"HTTP/1.1 400")
+
+
+def test_stop_fails_pending_requests(base_scenario):
+    async def main():
+        service = SAF_Evaluation_Service(max_latency=0.5)
+        await service.start()
+        task = asyncio.create_task(service.evaluate(base_scenario))
+        await asyncio.sleep(0.05)
+        await service.stop()
+        return await asyncio.wait_for(task, 1.0)
+
+    with pytest.raises(ServiceUnavailableError, match="Service stopped"):
+        asyncio.run(main())
+
+
+def test_stopped_service_returns_503(base_scenario):
+    async def main():
+        service = SAF_Evaluation_Service()
+        return await service._dispatch("POST", "/evaluate", json.dumps(base_scenario).encode())
+
+    status, payload = asyncio.run(main())
+    assert status == 503
+    assert "not started" in payload["error"]
+
+
+def test_server_failure_returns_500(base_scenario, monkeypatch):
+    def broken(scenarios, fossil_jet_emissions):
+        raise KeyError("internal")
+
+    monkeypatch.setattr(evaluation_service, "evaluate_scenarios", broken)
+
+    async def scenario_run(service, client):
+        with pytest.raises(RuntimeError, match="HTTP 500") as error:
+            await client.evaluate(base_scenario)
+        return error.value
+
+    error = run_with_client(scenario_run)
+    assert not isinstance(error, ServiceUnavailableError)
+
+
+def test_sources_resolve_within_one_batch(base_scenario, capsys):
+    scenarios = [with_source(base_scenario, source) for source in SOURCES + ["unknown_grid"]]
+    outcomes = evaluate_scenarios(scenarios)
+
+    for scenario, outcome in zip(scenarios, outcomes):
+        expected, _ = scalar_results(scenario)
+        assert outcome["ghg_emissions"]["total"] == pytest.approx(expected["ghg_emissions"]["total"])
+    assert capsys.readouterr().out.count("'unknown_grid' not recognized") == 2
@@ -0,0 +1,114 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from LCA_calculation import SAF_LCA_Model
+from siting_analysis import SAF_Siting_Analysis
+
+
+@pytest.fixture
+def model(base_scenario):
+    model = SAF_LCA_Model(pathway=base_scenario["pathway"], functional_unit=base_scenario["functional_unit"],
+                          co2_source=base_scenario["co2_source"])
+    model.set_use_phase_data(**base_scenario["use_phase"])
+    model.set_carbon_capture_data(**base_scenario["carbon_capture"])
+    model.set_electrolysis_data(**base_scenario["electrolysis"])
+    model.set_conversion_data(**base_scenario["conversion"])
+    model.set_distribution_data(**base_scenario["distribution"])
+    return model
+
+
+def scalar_ghg(model, carbon_intensity, distance):
+    cell = copy.deepcopy(model)
+    cell.electrolysis_data["electricity_carbon_intensity"] = carbon_intensity
+    factor = distance / model.distribution_data["transport_distance"]
+    cell.distribution_data["ghg_emissions"] = model.distribution_data["ghg_emissions"] * factor
+    cell.distribution_data["energy_input"] = model.distribution_data["energy_input"] * factor
+    return cell.calculate_lca()
+
+
+def make_layers(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "carbon_intensity": rng.uniform(0.01, 0.8, shape),
+        "power_price": rng.uniform(0.02, 0.12, shape),
+        "water_stress": rng.uniform(0.1, 5.0, shape),
+        "airport_distance": rng.uniform(5.0, 800.0, shape)
+    }
+
+
+def test_cells_match_scalar_model(model):
+    layers = make_layers((3, 4))
+    outputs = SAF_Siting_Analysis(model, layers).evaluate_cells(**layers)
+
+    for row, col in [(0, 0), (1, 2), (2, 3)]:
+        expected = scalar_ghg(model, layers["carbon_intensity"][row, col], layers["airport_distance"][row, col])
+        assert outputs["ghg_total"][row, col] == pytest.approx(expected["ghg_emissions"]["total"])
+        assert outputs["energy_total"][row, col] == pytest.approx(expected["energy_consumption"]["total"])
+        assert outputs["water_scarcity"][row, col] == pytest.approx(
+            expected["water_usage"]["total"] * layers["water_stress"][row, col])
+
+
+def test_nan_cells_are_excluded(model, tmp_path):
+    layers = make_layers((4, 4))
+    layers["carbon_intensity"][0, 0] = np.nan
+    layers["power_price"][1, 1] = np.nan
+    layers["water_stress"][2, 2] = np.nan
+    layers["airport_distance"][3, 3] = np.nan
+
+    sites = SAF_Siting_Analysis(model, layers, tile_size=3).run(str(tmp_path), top_n=16)
+    for name in SAF_Siting_Analysis.OUTPUTS:
+        raster = np.load(tmp_path / f"{name}.npy")
+        assert np.isnan(raster[[0, 1, 2, 3], [0, 1, 2, 3]]).all()
+    assert len(sites) == 12
+    assert not set(zip(sites["row"], sites["col"])) & {(0, 0), (1, 1), (2, 2), (3, 3)}
+
+
+def test_tiles_cover_rasters_not_multiple_of_tile_size(model, tmp_path):
+    layers = make_layers((7, 5))
+    paths = {}
+    for name, values in layers.items():
+        paths[name] = str(tmp_path / f"input_{name}.npy")
+        np.save(paths[name], values)
+
+    SAF_Siting_Analysis(model, paths, tile_size=3).run(str(tmp_path / "tiled"))
+    SAF_Siting_Analysis(model, layers, tile_size=100).run(str(tmp_path / "whole"))
+    for name in SAF_Siting_Analysis.OUTPUTS:
+        np.testing.assert_array_equal(np.load(tmp_path / "tiled" / f"{name}.npy"),
+                                      np.load(tmp_path / "whole" / f"{name}.npy"))
+
+
+def test_ranking_top_n_and_order(model, tmp_path):
+    layers = make_layers((6, 6))
+    siting = SAF_Siting_Analysis(model, layers, tile_size=4)
+
+    lowest = siting.run(str(tmp_path / "low"), rank_by="ghg_total", top_n=5)
+    highest = siting.run(str(tmp_path / "high"), rank_by="electricity_cost", top_n=5, ascending=False)
+
+    ghg = np.load(tmp_path / "low" / "ghg_total.npy").ravel()
+    cost = np.load(tmp_path / "high" / "electricity_cost.npy").ravel()
+    assert list(lowest["rank"]) == [1, 2, 3, 4, 5]
+    np.testing.assert_allclose(lowest["ghg_total"], np.sort(ghg)[:5])
+    np.testing.assert_allclose(highest["electricity_cost"], np.sort(cost)[::-1][:5])
+    pd.testing.assert_frame_equal(lowest, pd.read_csv(tmp_path / "low" / "ranked_sites.csv"),
+                                  check_dtype=False)
+
+
+def test_max_water_stress_filters_ranking(model, tmp_path):
+    layers = make_layers((5, 5))
+    sites = SAF_Siting_Analysis(model, layers, tile_size=2).run(str(tmp_path), top_n=25, max_water_stress=2.0)
+
+    assert len(sites) == int((layers["water_stress"] <= 2.0).sum())
+    assert (sites["water_stress"] <= 2.0).all()
+
+
+def test_distribution_is_reset_without_airport_distance(model):
+    siting = SAF_Siting_Analysis(model, {"carbon_intensity": np.full((2, 2), 0.5)})
+    siting.evaluate_cells(np.full((2, 2), 0.5), airport_distance=np.full((2, 2), 100.0))
+
+    for shape in [(3, 3), (2, 2)]:
+        outputs = siting.evaluate_cells(np.full(shape, 0.5))
+        expected = scalar_ghg(model, 0.5, model.distribution_data["transport_distance"])
+        np.testing.assert_allclose(outputs["ghg_total"], expected["ghg_emissions"]["total"])
@@ -0,0 +1,184 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from sweep_runner import SAF_Sweep, SAF_Sweep_Runner
+
+MONTE_CARLO = {"carbon_capture.energy_requirement": ("normal", 30.0, 3.0)}
+
+
+class CrashingSweep(SAF_Sweep):
+    """Sweep whose worker process dies on selected shards"""
+
+    def __init__(self, *args, crash_shards=(), marker_dir=None, **kwargs):
+        self.crash_shards = set(crash_shards)
+        self.marker_dir = marker_dir
+        super().__init__(*args, **kwargs)
+
+    def evaluate_shard(self, shard, limit=None):
+        if limit is None and shard in self.crash_shards:
+            # With a marker directory the shard crashes only on its first attempt
+            marker = os.path.join(self.marker_dir, f"crashed_{shard}") if self.marker_dir else None
+            if marker is None or not os.path.exists(marker):
+                if marker is not None:
+                    open(marker, "w").close()
+                os._exit(1)
+        return super().evaluate_shard(shard, limit)
+
+
+def make_sweep(base_scenario, cls=SAF_Sweep, **kwargs):
+    options = dict(axes={"electrolysis.electricity_source": ["wind", "coal"]},
+                   monte_carlo=MONTE_CARLO, n_draws=100, shard_size=50)
+    options.update(kwargs)
+    return cls(base_scenario, **options)
+
+
+def test_shards_are_deterministic(base_scenario):
+    first = make_sweep(base_scenario).evaluate_shard(2)
+    second = make_sweep(base_scenario).evaluate_shard(2)
+    other_seed = make_sweep(base_scenario, seed=1).evaluate_shard(2)
+
+    for name in first:
+        np.testing.assert_array_equal(first[name], second[name])
+    assert not np.array_equal(first["energy_consumption.total"], other_seed["energy_consumption.total"])
+
+
+def test_resume_recomputes_nothing(base_scenario, tmp_path):
+    runner = SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path), n_workers=2)
+    runner.run()
+    shard_dir = tmp_path / "shards"
+    os.remove(shard_dir / "shard_000001.npz")
+    mtimes = {path.name: path.stat().st_mtime_ns for path in shard_dir.iterdir()}
+
+    resumed = SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path), n_workers=2)
+    assert resumed.pending_shards() == [1]
+    assert list(resumed.run()["shard"]) == [1]
+    assert all((shard_dir / name).stat().st_mtime_ns == mtime for name, mtime in mtimes.items())
+    assert resumed.run().empty
+
+
+def test_worker_crash_is_retried(base_scenario, tmp_path):
+    marker_dir = tmp_path / "markers"
+    marker_dir.mkdir()
+    sweep = make_sweep(base_scenario, cls=CrashingSweep, crash_shards={1}, marker_dir=str(marker_dir))
+    runner = SAF_Sweep_Runner(sweep, str(tmp_path / "checkpoints"), n_workers=2)
+
+    metrics = runner.run()
+    assert (marker_dir / "crashed_1").exists()
+    assert runner.is_complete()
+    assert sorted(metrics["shard"]) == list(range(sweep.n_shards))
+
+
+def test_poison_shard_fails_only_itself(base_scenario, tmp_path):
+    sweep = make_sweep(base_scenario, cls=CrashingSweep, crash_shards={1}, n_draws=1000)
+    assert sweep.n_shards == 40
+    runner = SAF_Sweep_Runner(sweep, str(tmp_path), n_workers=1, max_retries=2)
+
+    with pytest.raises(RuntimeError, match=r"^1 shard\(s\) failed"):
+        runner.run()
+    assert len(runner.completed_shards()) == 39
+    assert runner.pending_shards() == [1]
+    assert list(runner.metrics()["shard"]) == [s for s in range(40) if s != 1]
+
+
+def test_merge_is_ordered_across_nodes(base_scenario, tmp_path):
+    for node_index in (1, 0):
+        runner = SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path), n_workers=2,
+                                  node_index=node_index, n_nodes=2)
+        if node_index == 1:
+            with pytest.raises(RuntimeError, match="incomplete"):
+                runner.merge()
+        runner.run()
+
+    results = runner.merge()
+    sweep = make_sweep(base_scenario)
+    np.testing.assert_array_equal(results["index"], np.arange(sweep.n_units))
+    np.testing.assert_array_equal(results["ghg_emissions.total"][50:100],
+                                  sweep.evaluate_shard(1)["ghg_emissions.total"])
+
+
+def test_fingerprint_mismatch_is_detected(base_scenario, tmp_path):
+    SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path))
+    with pytest.raises(ValueError, match="different sweep"):
+        SAF_Sweep_Runner(make_sweep(base_scenario, seed=1), str(tmp_path))
+
+
+def test_large_shard_numbers_are_parsed(base_scenario, tmp_path):
+    runner = SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path))
+    open(tmp_path / "shards" / "shard_1234567.npz", "wb").close()
+    assert runner.completed_shards() == [1234567]
+
+
+def test_stale_temporary_files_are_ignored_and_removed(base_scenario, tmp_path):
+    runner = SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path), n_workers=1)
+    runner.run()
+    # A worker that died between writing its metrics and its shard
+    os.remove(tmp_path / "shards" / "shard_000003.npz")
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    stale = tmp_path / "shards" / f"shard_000003.npz.{socket.gethostname()}.{finished.pid}.tmp"
+    stale.write_bytes(b"partial")
+    # A worker of another runner on this host that is still writing
+    live = tmp_path / "shards" / f"shard_000004.npz.{socket.gethostname()}.{os.getpid()}.tmp"
+    live.write_bytes(b"in progress")
+
+    assert 3 not in list(runner.metrics()["shard"])
+    SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path))
+    assert not stale.exists()
+    assert live.exists()
+
+
+def test_swept_source_conflicts_with_fixed_intensity(base_scenario):
+    base_scenario["electrolysis"]["electricity_carbon_intensity"] = 0.02
+    with pytest.raises(ValueError, match="electricity_source"):
+        make_sweep(base_scenario)
+
+
+def test_reordered_axes_are_a_different_sweep(base_scenario, tmp_path):
+    axes = {"electrolysis.electricity_source": ["wind", "coal"],
+            "electrolysis.co2_electrolysis_efficiency": [70.0, 90.0]}
+    monte_carlo = {"carbon_capture.energy_requirement": ("normal", 30.0, 3.0),
+                   "carbon_capture.capture_efficiency": ("uniform", 75.0, 85.0)}
+    SAF_Sweep_Runner(make_sweep(base_scenario, axes=axes, monte_carlo=monte_carlo), str(tmp_path))
+
+    reversed_axes = dict(reversed(list(axes.items())))
+    reversed_monte_carlo = dict(reversed(list(monte_carlo.items())))
+    for kwargs in ({"axes": reversed_axes, "monte_carlo": monte_carlo},
+                   {"axes": axes, "monte_carlo": reversed_monte_carlo}):
+        with pytest.raises(ValueError, match="different sweep"):
+            SAF_Sweep_Runner(make_sweep(base_scenario, **kwargs), str(tmp_path))
+
+
+def test_parameter_swept_twice_is_rejected(base_scenario):
+    with pytest.raises(ValueError, match="swept more than once"):
+        make_sweep(base_scenario, monte_carlo={"electrolysis.energy_input_h2": ("normal", 55.0, 2.0)},
+                   axes={"case": [{"electrolysis.energy_input_h2": 50.0}, {}]})
+    with pytest.raises(ValueError, match="swept more than once"):
+        make_sweep(base_scenario, axes={"electrolysis.energy_input_h2": [50.0, 60.0],
+                                        "case": [{"electrolysis.energy_input_h2": 50.0}]})
+
+
+def test_scaling_summary_is_computed_per_run(base_scenario, tmp_path):
+    SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path), n_workers=2).run()
+    for shard in (1, 2):
+        os.remove(tmp_path / "shards" / f"shard_{shard:06d}.npz")
+    time.sleep(1.0)
+    runner = SAF_Sweep_Runner(make_sweep(base_scenario), str(tmp_path), n_workers=1)
+    runner.run()
+
+    metrics = runner.metrics()
+    assert set(metrics.groupby("run_id")["n_workers"].max()) == {1, 2}
+    summary = runner.scaling_summary()
+    assert summary["runs"] == 2
+    assert summary["workers"] == 2
+    # The pause between the two runs is not counted as active time
+    assert summary["elapsed_s"] < metrics["finished_at"].max() - metrics["started_at"].min() - 0.9
+
+    capacity = sum((group["finished_at"].max() - group["started_at"].min()) * group["n_workers"].max()
+                   for _, group in metrics.groupby("run_id"))
+    assert summary["parallel_efficiency"] == pytest.approx(metrics["wall_time_s"].sum() / capacity)